@@ -6,11 +6,29 @@ A socket broker that implements a bounded buffer (max size 10) for producer/cons
 Usage:
     python broker_server.py [host] [port]
 Defaults: host=127.0.0.1 port=6000
+
+Producer frames:
+ - b'P' + 4-byte idx + 4-byte xml_length + xml_bytes   -> ready immediately
+ - b'D' + 8-byte deliver_at (float seconds since the epoch) + the same idx/len/xml
+   -> held back until deliver_at, then moved into the ready buffer
+
+Consumer frame:
+ - b'C' -> b'E' (file missing) or b'K' + 4-byte idx + 4-byte xml_length + xml_bytes
+
+Tracing: any frame may be prefixed with b'T' + 8-byte client send time (float
+seconds since the epoch). For a traced consumer the b'K' reply carries six
+8-byte timestamps before idx: producer send (0.0 if the producer did not trace),
+broker receive, broker due (0.0 unless the item was delayed), broker enqueue,
+broker dequeue and broker send.
 """
 import socket
 import threading
 import struct
 import os
+import time
+import heapq
+import itertools
+import math
 from collections import deque
 
 SHARED_DIR = "shared"
@@ -24,6 +42,24 @@ buffer_lock = threading.Lock()
 not_empty = threading.Condition(buffer_lock)
 not_full = threading.Condition(buffer_lock)
 
+# Buffer entries are (idx, filename, (producer_send, broker_recv, broker_due, broker_enqueue)).
+# Files are named student<idx>-<seq>.xml with a broker-wide sequence number:
+# idx cycles 1..10 and delayed items can fall due while an item with the same
+# idx is still buffered, so idx alone does not identify a file.
+file_seq = itertools.count(1)
+
+# Delayed items wait outside the bounded buffer in a min-heap keyed on their
+# due time: (deliver_at, seq, idx, xml, producer_send, broker_recv). seq keeps
+# equal times in arrival order.
+delayed = []
+delayed_cv = threading.Condition()
+delayed_seq = itertools.count()
+# deliver_at further than this in the future is rejected as a bad frame
+MAX_DELAY = 7 * 24 * 3600.0
+# the heap holds full payloads in memory, so it is bounded like the buffer;
+# delayed frames arriving while it is full are rejected
+MAX_DELAYED = 1000
+
 def ensure_shared_dir():
     if not os.path.exists(SHARED_DIR):
         os.makedirs(SHARED_DIR)
@@ -37,45 +73,101 @@ def recv_exact(conn, n):
         data += pkt
     return data
 
-def handle_producer(conn, addr):
+def recv_item(conn):
+    # read index (4), xml length (4), xml bytes
+    idx_bytes = recv_exact(conn, 4)
+    idx = struct.unpack("!I", idx_bytes)[0]
+    ln_bytes = recv_exact(conn, 4)
+    ln = struct.unpack("!I", ln_bytes)[0]
+    xml = recv_exact(conn, ln)
+    return idx, xml
+
+def enqueue_item(idx, xml, sent_at, recv_at, due_at=0.0):
+    # wait for space in buffer
+    with not_full:
+        while len(buffer) >= MAX_BUFFER:
+            # block until not full
+            not_full.wait()
+        # write file
+        filename = os.path.join(SHARED_DIR, f"student{idx}-{next(file_seq)}.xml")
+        with open(filename, "wb") as f:
+            f.write(xml)
+        buffer.append((idx, filename, (sent_at, recv_at, due_at, time.time())))
+        print(f"[Broker] Produced {os.path.basename(filename)} -> buffer (size={len(buffer)})")
+        # notify consumers
+        not_empty.notify()
+
+def handle_producer(conn, addr, sent_at=0.0):
     try:
-        # read index (4), xml length (4), xml bytes
-        idx_bytes = recv_exact(conn, 4)
-        idx = struct.unpack("!I", idx_bytes)[0]
-        ln_bytes = recv_exact(conn, 4)
-        ln = struct.unpack("!I", ln_bytes)[0]
-        xml = recv_exact(conn, ln)
-
-        # wait for space in buffer
-        with not_full:
-            while len(buffer) >= MAX_BUFFER:
-                # block until not full
-                not_full.wait()
-            # write file
-            filename = os.path.join(SHARED_DIR, f"student{idx}.xml")
-            with open(filename, "wb") as f:
-                f.write(xml)
-            buffer.append(idx)
-            print(f"[Broker] Produced student{idx}.xml -> buffer (size={len(buffer)})")
-            # notify consumers
-            not_empty.notify()
+        idx, xml = recv_item(conn)
+        enqueue_item(idx, xml, sent_at, time.time())
         # done, close connection
     except Exception as e:
         print(f"[Broker] Producer handler error from {addr}: {e}")
     finally:
         conn.close()
 
-def handle_consumer(conn, addr):
+def handle_delayed_producer(conn, addr, sent_at=0.0):
+    try:
+        deliver_at = struct.unpack("!d", recv_exact(conn, 8))[0]
+        idx, xml = recv_item(conn)
+        recv_at = time.time()
+    except Exception as e:
+        print(f"[Broker] Delayed producer handler error from {addr}: {e}")
+        return
+    finally:
+        conn.close()
+
+    if not math.isfinite(deliver_at) or deliver_at - recv_at > MAX_DELAY:
+        print(f"[Broker] Rejected student{idx}.xml from {addr}: bad deliver_at {deliver_at!r}")
+        return
+    if deliver_at <= recv_at:
+        enqueue_item(idx, xml, sent_at, recv_at)
+        return
+    with delayed_cv:
+        if len(delayed) >= MAX_DELAYED:
+            print(f"[Broker] Rejected student{idx}.xml from {addr}: delayed queue full ({MAX_DELAYED})")
+            return
+        heapq.heappush(delayed, (deliver_at, next(delayed_seq), idx, xml, sent_at, recv_at))
+        # only a new earliest item changes how long the scheduler should sleep
+        if delayed[0][0] == deliver_at:
+            delayed_cv.notify()
+        print(f"[Broker] Delayed student{idx}.xml for {deliver_at - time.time():.2f}s (delayed={len(delayed)})")
+
+def delayed_scheduler():
+    """
+    Move delayed items into the ready buffer as they fall due. The thread sleeps
+    until the earliest deadline (or until an earlier item arrives) and only ever
+    looks at the top of the heap, so each item costs O(log n).
+    """
+    while True:
+        try:
+            with delayed_cv:
+                while True:
+                    if not delayed:
+                        delayed_cv.wait()
+                        continue
+                    remaining = delayed[0][0] - time.time()
+                    if remaining <= 0:
+                        break
+                    delayed_cv.wait(min(remaining, threading.TIMEOUT_MAX))
+                _, _, idx, xml, sent_at, recv_at = heapq.heappop(delayed)
+            # may block on not_full; later due items simply wait their turn
+            enqueue_item(idx, xml, sent_at, recv_at, time.time())
+        except Exception as e:
+            print(f"[Broker] Delayed scheduler error: {e}")
+
+def handle_consumer(conn, addr, traced=False):
     try:
         # block until item available
         with not_empty:
             while len(buffer) == 0:
                 not_empty.wait()
-            idx = buffer.popleft()
+            idx, filename, stamps = buffer.popleft()
+            dequeued_at = time.time()
             # notify producers that there's space
             not_full.notify()
 
-        filename = os.path.join(SHARED_DIR, f"student{idx}.xml")
         if not os.path.exists(filename):
             # If file missing, send error status (E) and return
             conn.sendall(b'E')
@@ -94,7 +186,10 @@ def handle_consumer(conn, addr):
             print(f"[Broker] failed to delete {filename}: {e}")
 
         # send success: 1-byte 'K', 4-byte idx, 4-byte len, xml bytes
+        # traced: 'K', six 8-byte timestamps, then idx/len/xml as above
         payload = struct.pack("!I", idx) + struct.pack("!I", len(xml)) + xml
+        if traced:
+            payload = struct.pack("!6d", *stamps, dequeued_at, time.time()) + payload
         conn.sendall(b'K' + payload)
         print(f"[Broker] Sent student{idx}.xml to consumer {addr} (buffer size now {len(buffer)})")
     except Exception as e:
@@ -106,10 +201,17 @@ def client_thread(conn, addr):
     try:
         # first byte: action
         action = recv_exact(conn, 1)
+        sent_at = 0.0
+        if action == b'T':
+            # trace header: client send time, then the actual action
+            sent_at = struct.unpack("!d", recv_exact(conn, 8))[0]
+            action = recv_exact(conn, 1)
         if action == b'P':
-            handle_producer(conn, addr)
+            handle_producer(conn, addr, sent_at)
+        elif action == b'D':
+            handle_delayed_producer(conn, addr, sent_at)
         elif action == b'C':
-            handle_consumer(conn, addr)
+            handle_consumer(conn, addr, traced=sent_at > 0.0)
         else:
             print(f"[Broker] Unknown action {action} from {addr}")
             conn.close()
@@ -122,6 +224,7 @@ def client_thread(conn, addr):
 
 def start_server(host=HOST, port=PORT):
     ensure_shared_dir()
+    threading.Thread(target=delayed_scheduler, daemon=True).start()
     s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     s.bind((host, port))
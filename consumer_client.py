@@ -5,29 +5,39 @@ consumer_client.py
 Socket-based Consumer client for the broker_server.
 
 Usage:
-    python consumer_client.py [host] [port] [delay]
+    python consumer_client.py [host] [port] [delay] [sink] [sink_path] [trace_sample]
 
-Defaults: host=127.0.0.1 port=6000 delay=0.2
+Defaults: host=127.0.0.1 port=6000 delay=0.2 sink=print trace_sample=0 (off)
+Sinks: print, text, csv, jsonl, columnar (see result_sinks.py)
+Pass "none" as sink_path to keep the sink's default path.
+trace_sample=N requests traced items, records per-stage latency histograms,
+prints every N-th trace and prints a latency summary on exit.
 
 Protocol (broker expects):
  - Client sends 1 byte action: b'C'
+   (traced: b'T' + 8-byte send time + b'C')
  - Broker responds:
     - b'E' -> error (no file found)
     - b'K' + 4-byte idx + 4-byte xml_length + xml_bytes
+      (traced: six 8-byte timestamps between b'K' and idx, see broker_server.py)
 
 This consumer:
  - Connects to broker
  - Sends b'C'
  - Waits for broker response
- - If 'K', parses XML, computes average and pass/fail, prints details
+ - If 'K', parses XML, computes average and pass/fail, hands the record to the sink
  - Loops forever (or until interrupted)
 """
+import signal
 import socket
 import struct
 import sys
 import time
 import xml.etree.ElementTree as ET
 
+from latency_trace import StageTracer
+from result_sinks import PrintSink, make_result, make_sink
+
 HOST = "127.0.0.1"
 PORT = 6000
 
@@ -41,8 +51,8 @@ def recv_exact(conn, n):
         data += chunk
     return data
 
-def parse_and_print_student(xml_bytes):
-    """Parse XML bytes into student fields, compute average and print record."""
+def parse_and_print_student(xml_bytes, sink=None):
+    """Parse XML bytes into student fields, compute average and write the record to sink (stdout by default)."""
     try:
         root = ET.fromstring(xml_bytes)
     except Exception as e:
@@ -64,31 +74,24 @@ def parse_and_print_student(xml_bytes):
                 mark = 0
             courses.append((cname, mark))
 
-    marks = [m for (_, m) in courses]
-    avg = sum(marks) / len(marks) if marks else 0.0
-    status = "PASS" if avg >= 50.0 else "FAIL"
-
-    print("----- Student Record -----")
-    print(f"Name: {name}")
-    print(f"Student ID: {sid}")
-    print(f"Programme: {programme}")
-    print("Courses and marks:")
-    for cn, mk in courses:
-        print(f"  {cn}: {mk}")
-    print(f"Average: {avg:.2f}")
-    print(f"Result: {status}")
-    print("--------------------------")
-
-def consume_once(host, port, timeout=30):
+    if sink is None:
+        sink = PrintSink()
+    sink.write(make_result(name, sid, programme, courses))
+
+def consume_once(host, port, timeout=30, sink=None, tracer=None):
     """
     Connect once, request an item from the broker, process it, and return.
     The broker will block the consumer until an item is available.
+    With a tracer the request is traced and the stage timings are recorded.
     """
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         s.settimeout(timeout)
         s.connect((host, port))
         # Send consumer action byte
-        s.sendall(b'C')
+        if tracer is not None:
+            s.sendall(b'T' + struct.pack("!d", time.time()) + b'C')
+        else:
+            s.sendall(b'C')
 
         # Read first response byte
         resp = recv_exact(s, 1)
@@ -99,6 +102,11 @@ def consume_once(host, port, timeout=30):
             print(f"[Consumer] Unexpected broker response: {resp!r}")
             return False
 
+        if tracer is not None:
+            stamps = dict(zip(("producer_send", "broker_recv", "broker_due", "broker_enqueue",
+                               "broker_dequeue", "broker_send"),
+                              struct.unpack("!6d", recv_exact(s, 48))))
+
         # Read index and xml length
         idx_bytes = recv_exact(s, 4)
         ln_bytes = recv_exact(s, 4)
@@ -107,18 +115,26 @@ def consume_once(host, port, timeout=30):
 
         # Read xml bytes
         xml = recv_exact(s, ln)
-
-        print(f"[Consumer] Received student{idx}.xml ({ln} bytes) from broker.")
-        parse_and_print_student(xml)
+        if tracer is not None:
+            stamps["consumer_recv"] = time.time()
+
+        if sink is None or isinstance(sink, PrintSink):
+            print(f"[Consumer] Received student{idx}.xml ({ln} bytes) from broker.")
+        parse_and_print_student(xml, sink)
+        if tracer is not None:
+            stamps["consumer_done"] = time.time()
+            tracer.record(stamps)
         # broker already removed the file from disk
         return True
 
-def main(host=HOST, port=PORT, delay=0.2):
+def main(host=HOST, port=PORT, delay=0.2, sink=None, tracer=None):
+    if sink is None:
+        sink = PrintSink()
     print(f"[Consumer] Connecting to broker at {host}:{port}. Delay between requests: {delay}s")
     try:
         while True:
             try:
-                ok = consume_once(host, port)
+                ok = consume_once(host, port, sink=sink, tracer=tracer)
                 # If consume_once returns False, still continue and retry
             except ConnectionError as e:
                 print(f"[Consumer] Connection error: {e}. Retrying in {delay} seconds...")
@@ -129,6 +145,11 @@ def main(host=HOST, port=PORT, delay=0.2):
             time.sleep(delay)
     except KeyboardInterrupt:
         print("\n[Consumer] Interrupted by user. Exiting.")
+    finally:
+        sink.close()
+        if tracer is not None and tracer.traced:
+            print("[Consumer] Latency by stage (ms):")
+            print(tracer.summary())
 
 if __name__ == "__main__":
     host = HOST
@@ -146,4 +167,21 @@ if __name__ == "__main__":
             delay = float(sys.argv[3])
         except:
             pass
-    main(host, port, delay)
+    sink_kind = "print"
+    sink_path = None
+    if len(sys.argv) >= 5:
+        sink_kind = sys.argv[4]
+    if len(sys.argv) >= 6 and sys.argv[5].lower() != "none":
+        sink_path = sys.argv[5]
+    tracer = None
+    if len(sys.argv) >= 7:
+        try:
+            sample_every = int(sys.argv[6])
+        except:
+            sample_every = 0
+        if sample_every > 0:
+            tracer = StageTracer(sample_every)
+    # SIGTERM (test_run_all.py stops consumers with terminate()) exits through
+    # main()'s finally block so file sinks are flushed and closed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    main(host, port, delay, make_sink(sink_kind, sink_path), tracer)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+latency_trace.py
+Per-stage latency accounting for traced records.
+
+A traced record carries wall-clock timestamps (time.time()) taken along its
+path: producer send, broker receive, broker due (delayed items only), broker
+enqueue, broker dequeue and broker send. The consumer adds its own receive and
+done times and hands them to a StageTracer, which turns them into stage
+durations and records each one in a LatencyHistogram. Every sample_every-th trace is also dumped as a JSON line so
+individual slow records can be inspected.
+
+Timestamps from different processes are only comparable when they share a
+clock, i.e. when producer, broker and consumer run on the same host.
+"""
+import json
+
+# Stage name -> (start stamp, end stamp). A tuple start uses the first stamp
+# present, e.g. not_full_wait starts when a delayed item fell due, otherwise
+# when the broker received it.
+STAGES = [
+    ("producer_to_broker", "producer_send", "broker_recv"),
+    ("scheduled_delay", "broker_recv", "broker_due"),
+    ("not_full_wait", ("broker_due", "broker_recv"), "broker_enqueue"),
+    ("buffer_residency", "broker_enqueue", "broker_dequeue"),
+    ("broker_io", "broker_dequeue", "broker_send"),
+    ("broker_to_consumer", "broker_send", "consumer_recv"),
+    ("parse", "consumer_recv", "consumer_done"),
+    # totals: end_to_end needs a tracing producer, broker_to_done is always there
+    ("end_to_end", "producer_send", "consumer_done"),
+    ("broker_to_done", "broker_recv", "consumer_done"),
+]
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of durations in microseconds: every power of two is
+    split into 8 buckets, so a recorded value lands in a bucket at most 12.5%
+    wide. Recording is a bit_length() and a list increment.
+    """
+
+    SUB_BITS = 3
+    SUB_COUNT = 1 << SUB_BITS
+
+    def __init__(self):
+        self.counts = [0] * (self.SUB_COUNT * 40)
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+
+    @classmethod
+    def _index(cls, us):
+        if us < cls.SUB_COUNT:
+            return us
+        b = us.bit_length()
+        shift = b - cls.SUB_BITS - 1
+        return ((shift + 1) << cls.SUB_BITS) | ((us >> shift) & (cls.SUB_COUNT - 1))
+
+    @classmethod
+    def _upper_bound(cls, index):
+        if index < cls.SUB_COUNT:
+            return index
+        shift = (index >> cls.SUB_BITS) - 1
+        low = (cls.SUB_COUNT | (index & (cls.SUB_COUNT - 1))) << shift
+        return low + (1 << shift) - 1
+
+    def record(self, seconds):
+        us = int(seconds * 1e6)
+        if us < 0:
+            us = 0  # clock steps between processes
+        i = self._index(us)
+        if i >= len(self.counts):
+            i = len(self.counts) - 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total_us += us
+        if us > self.max_us:
+            self.max_us = us
+
+    def percentile(self, p):
+        """Upper bound (microseconds) of the bucket holding the p-th percentile."""
+        if self.count == 0:
+            return 0
+        target = max(1, int(self.count * p / 100.0 + 0.5))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return min(self._upper_bound(i), self.max_us)
+        return self.max_us
+
+    def mean(self):
+        return self.total_us / self.count if self.count else 0.0
+
+
+class StageTracer:
+    """Collect stage histograms from traced records and dump a sample of raw traces."""
+
+    def __init__(self, sample_every=100, dump=print):
+        self.sample_every = sample_every
+        self.dump = dump
+        self.histograms = {name: LatencyHistogram() for name, _, _ in STAGES}
+        self.traced = 0
+
+    def record(self, stamps):
+        """
+        stamps maps stamp names (see STAGES) to time.time() values. A missing or
+        zero stamp (e.g. producer_send for an untraced producer) skips the stages
+        that need it.
+        """
+        stages = {}
+        for name, start, end in STAGES:
+            if isinstance(start, tuple):
+                t0 = next((stamps.get(s) for s in start if stamps.get(s)), None)
+            else:
+                t0 = stamps.get(start)
+            t1 = stamps.get(end)
+            if t0 and t1:
+                d = t1 - t0
+                self.histograms[name].record(d)
+                stages[name] = d
+        self.traced += 1
+        if self.sample_every and self.traced % self.sample_every == 0:
+            self.dump("[Trace] " + json.dumps({k: round(v * 1000.0, 3) for k, v in stages.items()}))
+
+    def summary(self):
+        """Table of count, mean and p50/p90/p99/max per stage, in milliseconds."""
+        lines = [f"{'stage':<20}{'count':>8}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}"]
+        for name, h in self.histograms.items():
+            if h.count == 0:
+                continue
+            lines.append(f"{name:<20}{h.count:>8}{h.mean() / 1000.0:>10.3f}"
+                         f"{h.percentile(50) / 1000.0:>10.3f}{h.percentile(90) / 1000.0:>10.3f}"
+                         f"{h.percentile(99) / 1000.0:>10.3f}{h.max_us / 1000.0:>10.3f}")
+        return "\n".join(lines)
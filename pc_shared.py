@@ -8,6 +8,8 @@ import xml.etree.ElementTree as ET
 import sys
 from collections import deque
 
+from result_sinks import PrintSink, make_result
+
 SHARED_DIR = "shared"
 MAX_BUFFER = 10
 
@@ -107,7 +109,9 @@ def producer_thread(produce_count=20, produce_delay=(0.2, 1.0)):
     print("[Producer] finished producing.")
 
 
-def consumer_thread(consume_delay=(0.1, 0.7)):
+def consumer_thread(consume_delay=(0.1, 0.7), sink=None):
+    if sink is None:
+        sink = PrintSink()
     while True:
         # wait for item
         full.acquire()
@@ -132,22 +136,8 @@ def consumer_thread(consume_delay=(0.1, 0.7)):
             with open(filename, "rb") as f:
                 xml_bytes = f.read()
             name, sid, programme, courses = xml_to_itstudent(xml_bytes)
-            
-            marks = [m for (_, m) in courses]
-            avg = sum(marks) / len(marks) if marks else 0.0
-            status = "PASS" if avg >= 50.0 else "FAIL"
 
-            
-            print("----- Student Record -----")
-            print(f"Name: {name}")
-            print(f"Student ID: {sid}")
-            print(f"Programme: {programme}")
-            print("Courses and marks:")
-            for cn, mk in courses:
-                print(f"  {cn}: {mk}")
-            print(f"Average: {avg:.2f}")
-            print(f"Result: {status}")
-            print("--------------------------")
+            sink.write(make_result(name, sid, programme, courses))
 
             # delete file (clear content)
             try:
@@ -172,7 +162,8 @@ if __name__ == "__main__":
             pass
 
 
-    consumer = threading.Thread(target=consumer_thread, daemon=True)
+    sink = PrintSink()
+    consumer = threading.Thread(target=consumer_thread, args=((0.1, 0.7), sink), daemon=True)
     consumer.start()
 
     producer = threading.Thread(target=producer_thread, args=(produce_count,), daemon=False)
@@ -189,5 +180,6 @@ if __name__ == "__main__":
         if bsize == 0:
             break
         time.sleep(0.2)
+    sink.close()
     print("THE CLASSICAL PRODUCERR-CONSUMER SOLUTION CSC 411")
 
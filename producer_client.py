@@ -4,8 +4,18 @@ producer_client.py
 Connects to broker and sends produced XML student files.
 
 Usage:
-    python producer_client.py [produce_count] [host] [port]
-Defaults: produce_count=20 host=127.0.0.1 port=6000
+    python producer_client.py [produce_count] [host] [port] [seed] [delay] [trace]
+Defaults: produce_count=20 host=127.0.0.1 port=6000 seed=None (unseeded) delay=None trace=0
+Pass "none" as the seed or delay to skip it while setting a later argument.
+
+With a delay (seconds) every record is sent as a delayed item: the broker holds
+it back and only makes it available to consumers once the delay has passed.
+With trace=1 (or true/yes) each frame carries the producer send time for latency tracing.
+
+Records are drawn in batches by generate_student_batches(); pass a seed to get
+the same sequence of XML records on every run, whatever the batch size. The
+sequence for a seed depends on the backend (NumPy when installed, random.Random
+otherwise), so compare seeded runs on machines with the same backend.
 """
 import socket
 import struct
@@ -14,16 +24,24 @@ import time
 import sys
 import xml.etree.ElementTree as ET
 
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is optional: the batch generator falls back to random.Random.
+    np = None
+
 HOST = "127.0.0.1"
 PORT = 6000
 
 PROGRAMMES = ["BSc.IT", "CS", "Software Engineering", "Information Systems"]
 COURSES = ["Programming 2", "Calculus", "Data Structures and Algorithms", "Database Design", "Networks", "Modern OS", "Web Technology and Development"]
+FIRST_NAMES = ["Temalungelo", "Sakhizwe", "Nomcebo", "Sebenele", "Thabani", "Lindelani", "Themba", "Skhandziso", "Skhanyiso", "Sphesihle"]
+LAST_NAMES = ["Malaza", "Ngwenya", "Dlamini", "Mhlanga", "Mamba", "Khumalo", "Mabuza", "Shongwe"]
+MIN_COURSES, MAX_COURSES = 3, 6
+MIN_MARK, MAX_MARK = 30, 100
 
 def random_name():
-    first = ["Temalungelo", "Sakhizwe", "Nomcebo", "Sebenele", "Thabani", "Lindelani", "Themba", "Skhandziso", "Skhanyiso", "Sphesihle"]
-    last = ["Malaza", "Ngwenya", "Dlamini", "Mhlanga", "Mamba", "Khumalo", "Mabuza", "Shongwe"]
-    return f"{random.choice(first)} {random.choice(last)}"
+    return f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}"
 
 def random_id():
     return "{:08d}".format(random.randint(0, 99999999))
@@ -32,9 +50,9 @@ def random_programme():
     return random.choice(PROGRAMMES)
 
 def random_courses():
-    n = random.randint(3, 6)
+    n = random.randint(MIN_COURSES, MAX_COURSES)
     chosen = random.sample(COURSES, n)
-    return [(c, random.randint(30, 100)) for c in chosen]
+    return [(c, random.randint(MIN_MARK, MAX_MARK)) for c in chosen]
 
 def itstudent_to_xml(name, sid, programme, courses):
     student = ET.Element("ITstudent")
@@ -48,36 +66,133 @@ def itstudent_to_xml(name, sid, programme, courses):
         ET.SubElement(c, "Mark").text = str(mark)
     return ET.tostring(student, encoding="utf-8", method="xml")
 
-def send_item(idx, xml_bytes, host=HOST, port=PORT):
+# Precompiled XML fragments for the batch generator. Joined in order they give
+# exactly the bytes itstudent_to_xml() produces for the same record. None of the
+# vocabulary needs XML escaping, so the fragments are plain encoded strings.
+_NAME_FRAGMENTS = [[f"<ITstudent><Name>{f} {l}</Name><StudentID>".encode("utf-8") for l in LAST_NAMES]
+                   for f in FIRST_NAMES]
+_PROGRAMME_FRAGMENTS = [f"</StudentID><Programme>{p}</Programme><Courses>".encode("utf-8") for p in PROGRAMMES]
+_COURSE_FRAGMENTS = [f"<Course><CourseName>{c}</CourseName><Mark>".encode("utf-8") for c in COURSES]
+_MARK_FRAGMENTS = [f"{m}</Mark></Course>".encode("utf-8") for m in range(MAX_MARK + 1)]
+_RECORD_TAIL = b"</Courses></ITstudent>"
+
+# Random fields are always drawn DRAW_BLOCK records at a time, so the record
+# stream for a seed does not depend on the batch_size the caller asks for.
+DRAW_BLOCK = 256
+
+def _draw_batch_numpy(rng, n):
+    """Draw every random field of n records with one vectorised call per field."""
+    first = rng.integers(0, len(FIRST_NAMES), n)
+    last = rng.integers(0, len(LAST_NAMES), n)
+    sids = rng.integers(0, 100000000, n)
+    progs = rng.integers(0, len(PROGRAMMES), n)
+    counts = rng.integers(MIN_COURSES, MAX_COURSES + 1, n)
+    # argsort of uniform keys gives an independent random permutation per row
+    order = rng.random((n, len(COURSES))).argsort(axis=1)[:, :MAX_COURSES]
+    marks = rng.integers(MIN_MARK, MAX_MARK + 1, (n, MAX_COURSES))
+    return (first.tolist(), last.tolist(), sids.tolist(), progs.tolist(),
+            counts.tolist(), order.tolist(), marks.tolist())
+
+def _draw_batch_stdlib(rng, n):
+    """Same draws as _draw_batch_numpy() using random.Random (no NumPy installed)."""
+    first = rng.choices(range(len(FIRST_NAMES)), k=n)
+    last = rng.choices(range(len(LAST_NAMES)), k=n)
+    sids = [rng.randrange(100000000) for _ in range(n)]
+    progs = rng.choices(range(len(PROGRAMMES)), k=n)
+    counts = rng.choices(range(MIN_COURSES, MAX_COURSES + 1), k=n)
+    order = [rng.sample(range(len(COURSES)), MAX_COURSES) for _ in range(n)]
+    marks = [rng.choices(range(MIN_MARK, MAX_MARK + 1), k=MAX_COURSES) for _ in range(n)]
+    return first, last, sids, progs, counts, order, marks
+
+def _render_block(rng, draw):
+    """Draw DRAW_BLOCK records and render each one from the precompiled fragments."""
+    first, last, sids, progs, counts, order, marks = draw(rng, DRAW_BLOCK)
+    records = []
+    for i in range(DRAW_BLOCK):
+        parts = [_NAME_FRAGMENTS[first[i]][last[i]], b"%08d" % sids[i], _PROGRAMME_FRAGMENTS[progs[i]]]
+        row_order = order[i]
+        row_marks = marks[i]
+        for j in range(counts[i]):
+            parts.append(_COURSE_FRAGMENTS[row_order[j]])
+            parts.append(_MARK_FRAGMENTS[row_marks[j]])
+        parts.append(_RECORD_TAIL)
+        records.append(b"".join(parts))
+    return records
+
+def generate_student_batches(count, batch_size=1000, seed=None):
+    """
+    Yield lists of XML-encoded student records, batch_size at a time, until
+    count records have been produced. Random fields are drawn DRAW_BLOCK records
+    at a time (vectorised with NumPy when it is installed) and each record is
+    rendered by joining precompiled fragments instead of building an ElementTree.
+    The record stream is deterministic for a given seed and backend; batch_size
+    only changes how it is chunked. Bad arguments raise ValueError immediately.
+    """
+    if count < 0:
+        raise ValueError(f"count must be >= 0, got {count}")
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+    if seed is not None and seed < 0:
+        raise ValueError(f"seed must be a non-negative integer, got {seed}")
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        draw = _draw_batch_numpy
+    else:
+        rng = random.Random(seed)
+        draw = _draw_batch_stdlib
+    return _iter_batches(count, batch_size, rng, draw)
+
+def _iter_batches(count, batch_size, rng, draw):
+    pending = []
+    remaining = count
+    while remaining > 0:
+        n = min(batch_size, remaining)
+        while len(pending) < n:
+            pending.extend(_render_block(rng, draw))
+        batch, pending = pending[:n], pending[n:]
+        remaining -= n
+        yield batch
+
+def send_item(idx, xml_bytes, host=HOST, port=PORT, deliver_at=None, delay=None, trace=False):
+    """
+    Send one record to the broker. deliver_at (seconds since the epoch) or delay
+    (seconds from now) asks the broker not to hand the record out before then.
+    trace prefixes the frame with the send time (taken before connecting).
+    """
+    sent_at = time.time()
+    if delay is not None:
+        deliver_at = sent_at + delay
     s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     s.connect((host, port))
     try:
         # action byte 'P', then idx (4), xml len (4), xml
-        header = b'P' + struct.pack("!I", idx) + struct.pack("!I", len(xml_bytes))
+        # or action byte 'D', deliver_at (8), then the same idx/len/xml
+        if deliver_at is None:
+            header = b'P'
+        else:
+            header = b'D' + struct.pack("!d", deliver_at)
+        header += struct.pack("!I", idx) + struct.pack("!I", len(xml_bytes))
+        if trace:
+            # trace header 'T' + send time (8) before the action byte
+            header = b'T' + struct.pack("!d", sent_at) + header
         s.sendall(header + xml_bytes)
         # we don't expect a response for produce
     finally:
         s.close()
 
-def main(produce_count=20, host=HOST, port=PORT):
+def main(produce_count=20, host=HOST, port=PORT, seed=None, delay=None, trace=False):
     file_index = 1
-    produced = 0
-    while produced < produce_count:
-        name = random_name()
-        sid = random_id()
-        prog = random_programme()
-        courses = random_courses()
-        xml_bytes = itstudent_to_xml(name, sid, prog, courses)
-        try:
-            send_item(file_index, xml_bytes, host, port)
-            print(f"[Producer] sent student{file_index}.xml to broker")
-        except Exception as e:
-            print(f"[Producer] failed to send to broker: {e}")
-        produced += 1
-        file_index += 1
-        if file_index > 10:
-            file_index = 1
-        time.sleep(random.uniform(0.2, 1.0))
+    for batch in generate_student_batches(produce_count, seed=seed):
+        for xml_bytes in batch:
+            try:
+                send_item(file_index, xml_bytes, host, port, delay=delay, trace=trace)
+                print(f"[Producer] sent student{file_index}.xml to broker")
+            except Exception as e:
+                print(f"[Producer] failed to send to broker: {e}")
+            file_index += 1
+            if file_index > 10:
+                file_index = 1
+            time.sleep(random.uniform(0.2, 1.0))
     print("[Producer] finished producing.")
 
 if __name__ == "__main__":
@@ -93,4 +208,21 @@ if __name__ == "__main__":
         host = sys.argv[2]
     if len(sys.argv) >= 4:
         port = int(sys.argv[3])
-    main(produce_count, host, port)
+    seed = None
+    if len(sys.argv) >= 5:
+        try:
+            seed = int(sys.argv[4])
+            if seed < 0:
+                seed = None
+        except:
+            pass
+    delay = None
+    if len(sys.argv) >= 6:
+        try:
+            delay = float(sys.argv[5])
+        except:
+            pass
+    trace = False
+    if len(sys.argv) >= 7:
+        trace = sys.argv[6].lower() in ("1", "true", "yes")
+    main(produce_count, host, port, seed, delay, trace)
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+result_sinks.py
+Output sinks for processed student records.
+
+Consumers hand every processed record to a sink instead of printing it field by
+field. PrintSink keeps the original human-readable output and is the default;
+the other sinks queue records and let a background writer thread write them in
+batches, flushing at least every flush_interval seconds.
+
+Sinks (see make_sink):
+    print     - human-readable record on stdout (default, unbuffered)
+    text      - same text, written in batches to a file or stdout
+    csv       - append-only CSV file
+    jsonl     - append-only JSON Lines file
+    columnar  - append-only binary file of column blocks (see read_columnar)
+"""
+import csv
+import io
+import json
+import queue
+import struct
+import sys
+import threading
+import time
+from array import array
+from collections import namedtuple
+
+StudentResult = namedtuple("StudentResult", ["name", "sid", "programme", "courses", "average", "status"])
+
+def make_result(name, sid, programme, courses):
+    """Compute average and pass/fail for a parsed student and build a StudentResult."""
+    marks = [m for (_, m) in courses]
+    avg = sum(marks) / len(marks) if marks else 0.0
+    status = "PASS" if avg >= 50.0 else "FAIL"
+    return StudentResult(name, sid, programme, courses, avg, status)
+
+def format_record(record):
+    """Render a StudentResult exactly as the consumers have always printed it."""
+    lines = [
+        "----- Student Record -----",
+        f"Name: {record.name}",
+        f"Student ID: {record.sid}",
+        f"Programme: {record.programme}",
+        "Courses and marks:",
+    ]
+    for cn, mk in record.courses:
+        lines.append(f"  {cn}: {mk}")
+    lines.append(f"Average: {record.average:.2f}")
+    lines.append(f"Result: {record.status}")
+    lines.append("--------------------------")
+    return "\n".join(lines) + "\n"
+
+
+class PrintSink:
+    """Print each record to stdout as soon as it arrives (interactive default)."""
+
+    def write(self, record):
+        print(format_record(record), end="")
+
+    def flush(self):
+        sys.stdout.flush()
+
+    def close(self):
+        self.flush()
+
+
+class BatchingSink:
+    """
+    Base class for sinks that write on a background thread.
+
+    write() only enqueues the record. The writer thread drains up to batch_size
+    records at a time, encodes them with _encode_batch(), writes the payload with
+    _write_payload() and flushes the underlying stream once flush_interval
+    seconds have passed since the last flush. Subclasses implement
+    _encode_batch(records) and _write_payload(payload) and may override
+    _flush() and _close().
+    """
+
+    _STOP = object()
+
+    def __init__(self, batch_size=256, flush_interval=1.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, daemon=True)
+        self._writer.start()
+
+    def write(self, record):
+        self._check_writer()
+        self._queue.put(record)
+
+    def flush(self):
+        """Block until every record written so far has reached the stream."""
+        self._check_writer()
+        done = threading.Event()
+        self._queue.put(done)
+        while not done.wait(0.1):
+            self._check_writer()
+
+    def _check_writer(self):
+        if not self._writer.is_alive():
+            raise RuntimeError(f"{type(self).__name__} writer thread is not running")
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(self._STOP)
+        self._writer.join()
+        self._close()
+
+    def _run(self):
+        try:
+            self._loop()
+        except Exception as e:
+            print(f"[Sink] writer thread stopped: {e}")
+
+    def _loop(self):
+        last_flush = time.monotonic()
+        while True:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+            batch = []
+            marker = None  # _STOP or a flush() Event ends the batch early
+            try:
+                item = self._queue.get(timeout=timeout)
+                while True:
+                    if item is self._STOP or isinstance(item, threading.Event):
+                        marker = item
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            if batch:
+                self._write_records(batch)
+            if marker is not None or time.monotonic() - last_flush >= self.flush_interval:
+                try:
+                    self._flush()
+                except Exception as e:
+                    print(f"[Sink] failed to flush: {e}")
+                last_flush = time.monotonic()
+            if marker is self._STOP:
+                return
+            if marker is not None:
+                marker.set()
+
+    def _write_records(self, batch):
+        try:
+            payload = self._encode_batch(batch)
+        except Exception:
+            # one bad record must not cost the rest of the batch: encode one by
+            # one and skip the records that cannot be encoded
+            parts = []
+            for record in batch:
+                try:
+                    parts.append(self._encode_batch([record]))
+                except Exception as e:
+                    print(f"[Sink] dropped record {getattr(record, 'sid', '?')}: {e}")
+            if not parts:
+                return
+            payload = parts[0][:0].join(parts)
+        # a failed write may have been partial, so it is logged, never replayed
+        try:
+            self._write_payload(payload)
+        except Exception as e:
+            print(f"[Sink] failed to write {len(batch)} records: {e}")
+
+    def _encode_batch(self, records):
+        """Return the str or bytes payload for records without writing anything."""
+        raise NotImplementedError
+
+    def _write_payload(self, payload):
+        raise NotImplementedError
+
+    def _flush(self):
+        pass
+
+    def _close(self):
+        pass
+
+
+class FileBatchingSink(BatchingSink):
+    """BatchingSink writing to a file opened for append (or to an existing stream)."""
+
+    mode = "a"
+
+    def __init__(self, path=None, stream=None, batch_size=256, flush_interval=1.0):
+        if stream is not None:
+            self._stream = stream
+            self._owns_stream = False
+        else:
+            kwargs = {} if "b" in self.mode else {"encoding": "utf-8", "newline": ""}
+            self._stream = open(path, self.mode, buffering=1 << 16, **kwargs)
+            self._owns_stream = True
+        self._prepare()
+        super().__init__(batch_size, flush_interval)
+
+    def _prepare(self):
+        pass
+
+    def _write_payload(self, payload):
+        self._stream.write(payload)
+
+    def _flush(self):
+        self._stream.flush()
+
+    def _close(self):
+        self._stream.flush()
+        if self._owns_stream:
+            self._stream.close()
+
+
+class BufferedTextSink(FileBatchingSink):
+    """Human-readable records, one write() per batch. Writes to stdout if no path is given."""
+
+    def __init__(self, path=None, batch_size=256, flush_interval=1.0):
+        stream = sys.stdout if path is None else None
+        super().__init__(path, stream, batch_size, flush_interval)
+
+    def _encode_batch(self, records):
+        return "".join(format_record(r) for r in records)
+
+
+class CsvSink(FileBatchingSink):
+    """Append-only CSV. Courses are packed into one column as 'name:mark;name:mark'."""
+
+    HEADER = ["name", "student_id", "programme", "courses", "average", "result"]
+
+    def _prepare(self):
+        if self._stream.tell() == 0:
+            csv.writer(self._stream).writerow(self.HEADER)
+
+    def _encode_batch(self, records):
+        out = io.StringIO()
+        csv.writer(out).writerows(
+            [r.name, r.sid, r.programme, ";".join(f"{cn}:{mk}" for cn, mk in r.courses),
+             f"{r.average:.2f}", r.status]
+            for r in records)
+        return out.getvalue()
+
+
+class JsonlSink(FileBatchingSink):
+    """Append-only JSON Lines, one object per record."""
+
+    def _encode_batch(self, records):
+        return "".join(
+            json.dumps({"name": r.name, "student_id": r.sid, "programme": r.programme,
+                        "courses": [[cn, mk] for cn, mk in r.courses],
+                        "average": r.average, "result": r.status}) + "\n"
+            for r in records)
+
+
+# Columnar block layout (all integers and floats little-endian):
+#   magic b"SRCB", uint32 record count n, uint32 course count m, then columns
+#   name, sid, programme : uint32 offsets[n+1] followed by the UTF-8 bytes
+#   average              : float64[n]
+#   passed               : uint8[n]
+#   course_count         : uint32[n]
+#   course_name          : uint32 offsets[m+1] followed by the UTF-8 bytes
+#   mark                 : int32[m]
+COLUMNAR_MAGIC = b"SRCB"
+
+def _le(arr):
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr.tobytes()
+
+def _pack_strings(values):
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = array("I", [0])
+    total = 0
+    for b in encoded:
+        total += len(b)
+        offsets.append(total)
+    return _le(offsets) + b"".join(encoded)
+
+def _unpack_strings(data, pos, n):
+    offsets = array("I")
+    offsets.frombytes(data[pos:pos + 4 * (n + 1)])
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    pos += 4 * (n + 1)
+    blob = data[pos:pos + offsets[-1]]
+    values = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(n)]
+    return values, pos + offsets[-1]
+
+def _unpack_array(typecode, data, pos, n):
+    arr = array(typecode)
+    arr.frombytes(data[pos:pos + arr.itemsize * n])
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr, pos + arr.itemsize * n
+
+
+class ColumnarSink(FileBatchingSink):
+    """Append-only binary file: every batch becomes one column block."""
+
+    mode = "ab"
+
+    def _encode_batch(self, records):
+        course_counts = array("I", [len(r.courses) for r in records])
+        course_names = [cn for r in records for cn, _ in r.courses]
+        marks = array("i", [mk for r in records for _, mk in r.courses])
+        parts = [
+            COLUMNAR_MAGIC,
+            struct.pack("<II", len(records), len(course_names)),
+            _pack_strings([r.name for r in records]),
+            _pack_strings([r.sid for r in records]),
+            _pack_strings([r.programme for r in records]),
+            _le(array("d", [r.average for r in records])),
+            bytes(r.status == "PASS" for r in records),
+            _le(course_counts),
+            _pack_strings(course_names),
+            _le(marks),
+        ]
+        return b"".join(parts)
+
+
+def read_columnar(path):
+    """Yield the StudentResults stored in a file written by ColumnarSink."""
+    with open(path, "rb") as f:
+        data = f.read()
+    pos = 0
+    while pos < len(data):
+        if data[pos:pos + 4] != COLUMNAR_MAGIC:
+            raise ValueError(f"bad columnar block at offset {pos}")
+        n, m = struct.unpack_from("<II", data, pos + 4)
+        pos += 12
+        names, pos = _unpack_strings(data, pos, n)
+        sids, pos = _unpack_strings(data, pos, n)
+        programmes, pos = _unpack_strings(data, pos, n)
+        averages, pos = _unpack_array("d", data, pos, n)
+        passed = data[pos:pos + n]
+        pos += n
+        counts, pos = _unpack_array("I", data, pos, n)
+        course_names, pos = _unpack_strings(data, pos, m)
+        marks, pos = _unpack_array("i", data, pos, m)
+        c = 0
+        for i in range(n):
+            courses = list(zip(course_names[c:c + counts[i]], marks[c:c + counts[i]]))
+            c += counts[i]
+            yield StudentResult(names[i], sids[i], programmes[i], courses, averages[i],
+                                "PASS" if passed[i] else "FAIL")
+
+
+SINKS = {
+    "print": PrintSink,
+    "text": BufferedTextSink,
+    "csv": CsvSink,
+    "jsonl": JsonlSink,
+    "columnar": ColumnarSink,
+}
+
+DEFAULT_PATHS = {
+    "csv": "results.csv",
+    "jsonl": "results.jsonl",
+    "columnar": "results.bin",
+}
+
+def make_sink(kind="print", path=None):
+    """Build a sink by name; file sinks default to results.<ext> in the working directory."""
+    if kind not in SINKS:
+        raise ValueError(f"unknown sink {kind!r} (choose from {', '.join(SINKS)})")
+    if kind == "print":
+        return PrintSink()
+    if kind == "text":
+        return BufferedTextSink(path)
+    return SINKS[kind](path or DEFAULT_PATHS[kind])
@@ -0,0 +1,93 @@
+"""Checks for delayed delivery in broker_server.py (no sockets needed)."""
+import math
+import struct
+import threading
+import time
+
+import pytest
+
+import broker_server
+
+
+class FakeConn:
+    """Just enough of a socket for the broker's frame readers."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def recv(self, n):
+        chunk, self.data = self.data[:n], self.data[n:]
+        return chunk
+
+    def close(self):
+        pass
+
+
+def delayed_frame(idx, deliver_at, xml=b"<ITstudent/>"):
+    return struct.pack("!d", deliver_at) + struct.pack("!I", idx) + struct.pack("!I", len(xml)) + xml
+
+
+def take(timeout=5.0):
+    with broker_server.not_empty:
+        assert broker_server.not_empty.wait_for(lambda: broker_server.buffer, timeout)
+        item = broker_server.buffer.popleft()
+        broker_server.not_full.notify()
+        return item
+
+
+@pytest.fixture(autouse=True)
+def broker(tmp_path, monkeypatch):
+    monkeypatch.setattr(broker_server, "SHARED_DIR", str(tmp_path))
+    broker_server.buffer.clear()
+    with broker_server.delayed_cv:
+        broker_server.delayed.clear()
+    if not getattr(broker_server, "_test_scheduler", None):
+        broker_server._test_scheduler = threading.Thread(target=broker_server.delayed_scheduler, daemon=True)
+        broker_server._test_scheduler.start()
+    yield
+    broker_server.buffer.clear()
+    with broker_server.delayed_cv:
+        broker_server.delayed.clear()
+
+
+def test_delayed_items_released_in_due_order():
+    now = time.time()
+    for idx, delay in [(1, 0.3), (2, 0.1), (3, 0.2)]:
+        broker_server.handle_delayed_producer(FakeConn(delayed_frame(idx, now + delay)), "test")
+    assert [take()[0] for _ in range(3)] == [2, 3, 1]
+    assert time.time() - now >= 0.3
+
+
+def test_due_item_skips_heap():
+    broker_server.handle_delayed_producer(FakeConn(delayed_frame(4, time.time() - 1.0)), "test")
+    assert broker_server.buffer[0][0] == 4
+    assert not broker_server.delayed
+
+
+@pytest.mark.parametrize("deliver_at", [math.nan, math.inf, time.time() + 1e12])
+def test_bad_deliver_at_rejected(deliver_at):
+    broker_server.handle_delayed_producer(FakeConn(delayed_frame(5, deliver_at)), "test")
+    assert not broker_server.delayed
+    assert not broker_server.buffer
+    # the scheduler still delivers later items
+    broker_server.handle_delayed_producer(FakeConn(delayed_frame(6, time.time() + 0.05)), "test")
+    assert take()[0] == 6
+
+
+def test_same_idx_gets_separate_files():
+    broker_server.enqueue_item(3, b"<a/>", 0.0, time.time())
+    broker_server.enqueue_item(3, b"<b/>", 0.0, time.time())
+    (_, first, _), (_, second, _) = take(), take()
+    assert first != second
+    with open(first, "rb") as f:
+        assert f.read() == b"<a/>"
+    with open(second, "rb") as f:
+        assert f.read() == b"<b/>"
+
+
+def test_delayed_queue_is_bounded(monkeypatch):
+    monkeypatch.setattr(broker_server, "MAX_DELAYED", 2)
+    later = time.time() + 60.0
+    for idx in (7, 8, 9):
+        broker_server.handle_delayed_producer(FakeConn(delayed_frame(idx, later)), "test")
+    assert sorted(item[2] for item in broker_server.delayed) == [7, 8]
@@ -0,0 +1,82 @@
+"""Checks for the latency histogram and stage tracer in latency_trace.py."""
+from latency_trace import LatencyHistogram, StageTracer
+
+
+def test_bucket_bounds_cover_every_value():
+    prev = -1
+    for us in list(range(0, 5000)) + [2 ** 20 - 1, 2 ** 20, 10 ** 9]:
+        i = LatencyHistogram._index(us)
+        assert i >= prev
+        prev = i
+        upper = LatencyHistogram._upper_bound(i)
+        assert us <= upper
+        assert LatencyHistogram._index(upper) == i
+        # buckets are at most 1/8 of their lower bound wide
+        assert upper - us <= max(0, us // 8)
+
+
+def test_small_values_are_exact():
+    for us in range(8):
+        assert LatencyHistogram._upper_bound(LatencyHistogram._index(us)) == us
+
+
+def test_percentile():
+    h = LatencyHistogram()
+    for ms in range(1, 101):
+        h.record(ms / 1000.0)
+    assert h.count == 100
+    assert h.max_us == 100000
+    assert 50000 <= h.percentile(50) <= 50000 * 1.125
+    assert 99000 <= h.percentile(99) <= 100000
+    assert h.percentile(100) == 100000
+    assert abs(h.mean() - 50500) < 1
+
+
+def test_empty_and_negative():
+    h = LatencyHistogram()
+    assert h.percentile(99) == 0
+    h.record(-0.5)
+    assert h.percentile(50) == 0
+
+
+def stamps(**offsets):
+    base = 1000.0
+    return {k: base + v for k, v in offsets.items()}
+
+
+def test_scheduled_delay_kept_out_of_not_full_wait():
+    tracer = StageTracer(sample_every=0)
+    tracer.record(stamps(producer_send=0.0, broker_recv=0.001, broker_due=0.501, broker_enqueue=0.502,
+                         broker_dequeue=0.6, broker_send=0.601, consumer_recv=0.602, consumer_done=0.603))
+    h = tracer.histograms
+    assert 499000 <= h["scheduled_delay"].max_us <= 500001
+    assert h["not_full_wait"].max_us <= 1001
+
+
+def test_not_full_wait_without_delay_starts_at_receive():
+    tracer = StageTracer(sample_every=0)
+    tracer.record(stamps(broker_recv=0.0, broker_enqueue=0.004, broker_dequeue=0.005, broker_send=0.006,
+                         consumer_recv=0.007, consumer_done=0.008))
+    h = tracer.histograms
+    assert h["scheduled_delay"].count == 0
+    assert 3999 <= h["not_full_wait"].max_us <= 4001
+
+
+def test_end_to_end_only_for_traced_producers():
+    tracer = StageTracer(sample_every=0)
+    tracer.record(stamps(broker_recv=0.0, broker_enqueue=0.001, consumer_done=0.010))
+    assert tracer.histograms["end_to_end"].count == 0
+    assert tracer.histograms["broker_to_done"].count == 1
+    tracer.record(stamps(producer_send=0.0, broker_recv=0.002, broker_enqueue=0.003, consumer_done=0.010))
+    assert tracer.histograms["end_to_end"].count == 1
+    assert tracer.histograms["broker_to_done"].count == 2
+
+
+def test_sampled_dump():
+    dumped = []
+    tracer = StageTracer(sample_every=2, dump=dumped.append)
+    for _ in range(5):
+        tracer.record(stamps(broker_recv=0.0, consumer_done=0.001))
+    assert len(dumped) == 2
+    assert dumped[0].startswith("[Trace] ")
+    assert "broker_to_done" in tracer.summary()
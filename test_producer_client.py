@@ -0,0 +1,71 @@
+"""Checks for the batch record generator in producer_client.py."""
+import random
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import producer_client
+
+
+def collect(count, batch_size, seed):
+    return [x for batch in producer_client.generate_student_batches(count, batch_size, seed) for x in batch]
+
+
+def test_same_seed_gives_same_records():
+    assert collect(250, 100, seed=42) == collect(250, 100, seed=42)
+    assert collect(250, 100, seed=42) != collect(250, 100, seed=43)
+
+
+def test_records_do_not_depend_on_batch_size():
+    expected = collect(600, 1000, seed=1)
+    for batch_size in (1, 3, 10, 256, 257):
+        assert collect(600, batch_size, seed=1) == expected
+    assert collect(10, 10, seed=1) == expected[:10]
+
+
+@pytest.mark.parametrize("kwargs", [{"count": -1}, {"batch_size": 0}, {"seed": -1}])
+def test_bad_arguments_raise_immediately(kwargs):
+    args = {"count": 10, "batch_size": 5, "seed": 1}
+    args.update(kwargs)
+    with pytest.raises(ValueError):
+        producer_client.generate_student_batches(**args)
+
+
+def test_zero_count_yields_nothing():
+    assert list(producer_client.generate_student_batches(0, seed=1)) == []
+
+
+def test_batches_cover_count():
+    batches = list(producer_client.generate_student_batches(250, 100, seed=1))
+    assert [len(b) for b in batches] == [100, 100, 50]
+
+
+def test_fragments_match_itstudent_to_xml():
+    for xml in collect(200, 64, seed=7):
+        root = ET.fromstring(xml)
+        courses = [(c.findtext("CourseName"), int(c.findtext("Mark"))) for c in root.find("Courses")]
+        assert producer_client.MIN_COURSES <= len(courses) <= producer_client.MAX_COURSES
+        assert len({cn for cn, _ in courses}) == len(courses)
+        rebuilt = producer_client.itstudent_to_xml(
+            root.findtext("Name"), root.findtext("StudentID"), root.findtext("Programme"), courses)
+        assert rebuilt == xml
+
+
+def test_stdlib_fallback_is_deterministic(monkeypatch):
+    monkeypatch.setattr(producer_client, "np", None)
+    assert collect(50, 20, seed=3) == collect(50, 20, seed=3)
+    assert collect(50, 7, seed=3) == collect(50, 50, seed=3)
+
+
+def test_fragments_match_for_random_records():
+    random.seed(5)
+    name = producer_client.random_name()
+    first, last = name.split(" ")
+    courses = [(producer_client.COURSES[1], 30), (producer_client.COURSES[4], 100)]
+    parts = [producer_client._NAME_FRAGMENTS[producer_client.FIRST_NAMES.index(first)][producer_client.LAST_NAMES.index(last)],
+             b"00001234", producer_client._PROGRAMME_FRAGMENTS[2]]
+    for cn, mk in courses:
+        parts += [producer_client._COURSE_FRAGMENTS[producer_client.COURSES.index(cn)], producer_client._MARK_FRAGMENTS[mk]]
+    parts.append(producer_client._RECORD_TAIL)
+    expected = producer_client.itstudent_to_xml(name, "00001234", producer_client.PROGRAMMES[2], courses)
+    assert b"".join(parts) == expected
@@ -0,0 +1,138 @@
+"""Checks for the consumer output sinks in result_sinks.py."""
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import result_sinks
+from result_sinks import ColumnarSink, CsvSink, JsonlSink, make_result, read_columnar
+
+
+RECORDS = [
+    make_result("Thabani Dlamini", "12345678", "BSc.IT", [("Calculus", 75), ("Networks", 40)]),
+    make_result("Nomcebo Malaza", "00000001", "CS", []),
+    make_result("Themba Mamba", "<unknown>", "Information Systems", [("Modern OS", 100), ("Calculus", 30), ("Networks", 51)]),
+]
+
+
+def test_columnar_round_trip(tmp_path):
+    path = tmp_path / "results.bin"
+    sink = ColumnarSink(str(path), batch_size=2)
+    for r in RECORDS:
+        sink.write(r)
+    sink.close()
+    assert list(read_columnar(str(path))) == RECORDS
+
+
+def test_columnar_keeps_out_of_range_marks(tmp_path):
+    odd = make_result("Sebenele Khumalo", "00000002", "CS", [("Calculus", -1), ("Networks", 70000)])
+    path = tmp_path / "results.bin"
+    sink = ColumnarSink(str(path))
+    for r in [RECORDS[0], odd, RECORDS[2]]:
+        sink.write(r)
+    sink.close()
+    assert list(read_columnar(str(path))) == [RECORDS[0], odd, RECORDS[2]]
+
+
+def test_bad_record_does_not_drop_batch(tmp_path):
+    bad = make_result("Themba Mamba", "00000003", "CS", [("Calculus", 2 ** 40)])
+    path = tmp_path / "results.bin"
+    sink = ColumnarSink(str(path))
+    for r in [RECORDS[0], bad, RECORDS[1]]:
+        sink.write(r)
+    sink.close()
+    assert list(read_columnar(str(path))) == [RECORDS[0], RECORDS[1]]
+
+
+def test_csv_header_written_once_on_append(tmp_path):
+    path = tmp_path / "results.csv"
+    for _ in range(2):
+        sink = CsvSink(str(path))
+        for r in RECORDS:
+            sink.write(r)
+        sink.close()
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert lines[0] == ",".join(CsvSink.HEADER)
+    assert lines.count(lines[0]) == 1
+    assert len(lines) == 1 + 2 * len(RECORDS)
+
+
+def test_flush_error_keeps_writer_running(tmp_path):
+    class FailingFlush(JsonlSink):
+        failures = 1
+
+        def _flush(self):
+            if self.failures:
+                self.failures -= 1
+                raise OSError("disk full")
+            super()._flush()
+
+    path = tmp_path / "results.jsonl"
+    sink = FailingFlush(str(path))
+    sink.write(RECORDS[0])
+    sink.flush()
+    sink.write(RECORDS[1])
+    sink.flush()
+    sink.close()
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2
+
+
+def test_write_fails_once_writer_is_gone(tmp_path):
+    sink = JsonlSink(str(tmp_path / "results.jsonl"))
+    sink.close()
+    with pytest.raises(RuntimeError):
+        sink.write(RECORDS[0])
+    with pytest.raises(RuntimeError):
+        sink.flush()
+
+
+def test_make_sink_rejects_unknown_kind():
+    with pytest.raises(ValueError):
+        result_sinks.make_sink("parquet")
+
+
+def test_close_twice_is_harmless(tmp_path):
+    sink = CsvSink(str(tmp_path / "results.csv"))
+    sink.write(RECORDS[0])
+    sink.close()
+    sink.close()
+
+
+def test_failed_write_is_not_replayed(tmp_path):
+    class PartialWrite(JsonlSink):
+        failures = 1
+
+        def _write_payload(self, payload):
+            if self.failures:
+                self.failures -= 1
+                super()._write_payload(payload[:len(payload) // 2])
+                raise OSError("disk full")
+            super()._write_payload(payload)
+
+    path = tmp_path / "results.jsonl"
+    sink = PartialWrite(str(path))
+    for r in RECORDS:
+        sink.write(r)
+    sink.flush()
+    sink.write(RECORDS[0])
+    sink.close()
+    text = path.read_text(encoding="utf-8")
+    # the half-written batch stays as it is; only the later record follows it
+    assert text.count('"Nomcebo Malaza"') <= 1
+    assert text.count('"Themba Mamba"') <= 1
+    assert text.endswith(JsonlSink._encode_batch(None, [RECORDS[0]]))
+
+
+def test_sigterm_flushes_consumer_sink(tmp_path):
+    path = tmp_path / "results.csv"
+    here = os.path.dirname(os.path.abspath(__file__))
+    # nothing listens on this port, so the consumer just retries until terminated
+    proc = subprocess.Popen([sys.executable, os.path.join(here, "consumer_client.py"),
+                             "127.0.0.1", "1", "0.05", "csv", str(path)],
+                            cwd=here, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(1.0)
+    proc.terminate()
+    proc.wait(timeout=10)
+    assert path.read_text(encoding="utf-8").splitlines() == [",".join(CsvSink.HEADER)]